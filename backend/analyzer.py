@@ -5,38 +5,299 @@ Analyzes SEC filings and generates ZK proofs for insider signals
 
 import os
 import json
+import asyncio
 import hashlib
+import threading
 import subprocess
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
-from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
+import functools
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import IO, AsyncIterator, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass, asdict, fields, replace
+from operator import attrgetter
+from datetime import date, datetime
+import aiohttp
+import numpy as np
+import orjson
+from Crypto.Hash import keccak
+from lxml import etree
 import re
 
-# AI/NLP imports
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# AI/NLP imports (openai is imported when a client is created; it is slow to load)
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+if not OPENAI_AVAILABLE:
     print("⚠️  OpenAI not installed. Using rule-based analysis.")
 
-# IPFS integration
-import ipfshttpclient
+# Optional JIT for the scoring kernel (numba is imported on first use)
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
 
-@dataclass
+# IPFS HTTP API (go-ipfs / kubo daemon)
+IPFS_API_URL = f"http://{os.getenv('IPFS_HOST', '127.0.0.1')}:{os.getenv('IPFS_PORT', '5001')}/api/v0"
+
+# EDGAR company browse feeds are Atom documents
+ATOM_NS = {"atom": "http://www.w3.org/2005/Atom"}
+
+# Long-lived Node process that keeps the proving key and circuit wasm loaded
+PROVER_WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prover_worker.js")
+
+# Seconds to wait for one proof before restarting the prover worker, and for
+# the worker to finish its queued proof on shutdown before it is killed
+PROVER_TIMEOUT = 60
+PROVER_SHUTDOWN_TIMEOUT = 5
+
+# BN254 scalar field modulus (circom/snarkjs field)
+BN254_FIELD_MODULUS = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+# Outbound HTTP connection pool (EDGAR, IPFS)
+HTTP_POOL_SIZE = 50
+HTTP_POOL_SIZE_PER_HOST = 20
+
+# Retry policy for EDGAR requests: exponential backoff on throttling, 5xx and connection errors
+EDGAR_MAX_RETRIES = 5
+EDGAR_BACKOFF_FACTOR = 0.8
+EDGAR_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Chunk size for streamed filing reads/uploads
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Characters of filing text sent with each AI prompt
+AI_PROMPT_CHARS = 8000
+
+# Item headers of 10-K/10-Q/8-K filings ("Item 1A.", "Item 5.02"); one alternation
+# scanned in a single pass locates every section boundary. Headers start a line,
+# so cross-references inside the text ("see Item 7") are not boundaries
+ITEM_HEADER_RE = re.compile(r'^[ \t]*Item\s+(\d{1,2}(?:\.\d{2}|[A-C])?)\b\.?', re.I | re.M)
+
+# Form 4 non-derivative transaction table
+FORM4_TABLE_RE = re.compile(r'<nonDerivativeTable>.*?</nonDerivativeTable>', re.S)
+
+# Filing item whose text is sent to the AI for each signal type
+AI_SIGNAL_ITEMS = {
+    "INSIDER_SELLING": "5",       # 10-K Item 5: market for registrant's equity
+    "EXECUTIVE_EXIT": "5.02",     # 8-K Item 5.02: departure of directors/officers
+    "RISK_LANGUAGE_SURGE": "1A",  # 10-K Item 1A: risk factors
+}
+
+# Worker processes for CPU-bound batch parsing/detection
+ANALYSIS_WORKERS = os.cpu_count() or 1
+
+# Entries kept in each in-memory EDGAR/parse cache
+CACHE_SIZE = 1024
+
+# Role importance weights (based on academic research)
+# CEO/CFO sales are more predictive than Director sales (read-only table)
+ROLE_WEIGHTS = MappingProxyType({
+    'ceo': 1.5,
+    'chief executive officer': 1.5,
+    'cfo': 1.4,
+    'chief financial officer': 1.4,
+    'coo': 1.3,
+    'chief operating officer': 1.3,
+    'president': 1.3,
+    'cto': 1.2,
+    'chief technology officer': 1.2,
+    'director': 1.0,
+    'officer': 0.9,
+    'insider': 0.8,
+    '10% owner': 0.7  # Large shareholders, less predictive
+})
+
+# Sales are time-clustered when they all fall within this many days
+CLUSTER_WINDOW_DAYS = 30
+
+# Upper bound on any title's role multiplier
+MAX_ROLE_WEIGHT = max(1.0, *ROLE_WEIGHTS.values())
+
+# Roles ordered by weight (highest first), so the first substring hit is the maximum
+_ROLE_WEIGHTS_BY_PRIORITY: Tuple[Tuple[str, float], ...] = tuple(
+    sorted(ROLE_WEIGHTS.items(), key=lambda item: (-item[1], -len(item[0])))
+)
+
+# Title normalization: drop periods/commas, hyphens become spaces ("C.E.O." -> "ceo")
+_TITLE_NORMALIZATION = str.maketrans({".": "", ",": "", "-": " "})
+
+def _scan_role_weight(title: str) -> float:
+    """Highest role weight (at least 1.0) among roles contained in a normalized title"""
+    for role, weight in _ROLE_WEIGHTS_BY_PRIORITY:
+        if role in title:
+            return max(weight, 1.0)
+    return 1.0
+
+# Bare role titles resolve with one dict lookup; weights come from the scan so both agree
+_TITLE_CANON = MappingProxyType({role: _scan_role_weight(role) for role in ROLE_WEIGHTS})
+
+def create_http_session() -> aiohttp.ClientSession:
+    """
+    Create an HTTP session backed by a keep-alive connection pool
+    
+    Must be called from a running event loop. Reusing one session across
+    requests amortizes TCP/TLS handshakes with sec.gov.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_SIZE,
+        limit_per_host=HTTP_POOL_SIZE_PER_HOST,
+        ttl_dns_cache=300
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+async def _iter_file(file: IO[bytes]) -> AsyncIterator[bytes]:
+    """Yield a file's remaining content in chunks (for chunked HTTP uploads)"""
+    while chunk := file.read(STREAM_CHUNK_SIZE):
+        yield chunk
+
+def _score_loop(
+    role_weights: np.ndarray,
+    percentage_sold: float
+) -> Tuple[float, float]:
+    """
+    Role-weighted scoring reduction over one filing's transactions
+    
+    Args:
+        role_weights: Role multiplier per transaction (float64)
+        percentage_sold: Unweighted percentage of holdings sold
+    
+    Returns:
+        Tuple of (role multiplier, effective percentage)
+    """
+    role_multiplier = role_weights[0]
+    for i in range(role_weights.shape[0]):
+        role_multiplier = max(role_multiplier, role_weights[i])
+    
+    return role_multiplier, percentage_sold * role_multiplier
+
+def _score_numpy(
+    role_weights: np.ndarray,
+    percentage_sold: float
+) -> Tuple[float, float]:
+    """Vectorized equivalent of the JIT scoring kernel"""
+    role_multiplier = role_weights.max()
+    return role_multiplier, percentage_sold * role_multiplier
+
+# Scoring implementation, chosen on first use
+_score_impl = None
+
+def _score_kernel(
+    role_weights: np.ndarray,
+    percentage_sold: float
+) -> Tuple[float, float]:
+    """Run the JIT-compiled scoring loop when numba is installed, else the NumPy version"""
+    global _score_impl
+    if _score_impl is None:
+        if NUMBA_AVAILABLE:
+            from numba import njit
+            # No on-disk cache: numba's cache records the importing module's name,
+            # so "analyzer" and "backend.analyzer" imports would break each other
+            _score_impl = njit(fastmath=True, boundscheck=False, error_model='numpy')(_score_loop)
+        else:
+            _score_impl = _score_numpy
+    
+    return _score_impl(role_weights, percentage_sold)
+
+# Cache sentinel for entries whose cached value is None
+_MISSING = object()
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry"""
+    
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+    
+    def get(self, key, default=None):
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+    
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+@dataclass(slots=True, frozen=True)
 class InsiderTransaction:
     """Represents an insider trading transaction"""
     insider_name: str
     title: str
-    transaction_date: str
+    transaction_date: int  # Day ordinal (date.toordinal()), so date math is integer math
     shares_sold: int
     shares_bought: int
     shares_owned_after: int
     transaction_type: str  # "Sale" or "Purchase"
+    
+    @classmethod
+    def from_api(
+        cls,
+        insider_name: str,
+        title: str,
+        transaction_date: str,
+        shares_sold: int,
+        shares_bought: int,
+        shares_owned_after: int,
+        transaction_type: str
+    ) -> "InsiderTransaction":
+        """
+        Create a transaction from filing/API values
+        
+        Args:
+            transaction_date: ISO date ("2025-01-15"); a trailing UTC offset is ignored
+        
+        Returns:
+            InsiderTransaction with the date stored as a day ordinal
+        """
+        return cls(
+            insider_name=insider_name,
+            title=title,
+            transaction_date=date.fromisoformat(transaction_date[:10]).toordinal(),
+            shares_sold=shares_sold,
+            shares_bought=shares_bought,
+            shares_owned_after=shares_owned_after,
+            transaction_type=transaction_type
+        )
+
+# Field values of a transaction, used as its content key for signal caching
+_transaction_key = attrgetter(*(f.name for f in fields(InsiderTransaction)))
+
+@dataclass(slots=True, frozen=True)
+class SignalDetails(Mapping):
+    """Supporting figures for an insider selling signal (read-only mapping)"""
+    total_shares_sold: int
+    total_shares_bought: int
+    percentage_sold: float
+    effective_percentage: float
+    threshold: float
+    num_transactions: int
+    num_unique_insiders: int
+    insiders: Tuple[str, ...]
+    roles: Tuple[str, ...]
+    role_multiplier: float
+    time_clustered: Optional[bool]
+    date_range_days: int
+    
+    # details['key'] and 'key' in details keep working as for the old dict
+    def __getitem__(self, key: str):
+        if key not in _signal_detail_keys:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __iter__(self):
+        return iter(_signal_detail_keys)
+    
+    def __len__(self) -> int:
+        return len(_signal_detail_keys)
 
-@dataclass
+# Mapping keys of SignalDetails, in field order
+_signal_detail_keys = tuple(f.name for f in fields(SignalDetails))
+
+@dataclass(slots=True, frozen=True)
 class InsiderSignal:
     """Represents a detected insider signal"""
     signal_type: str  # "INSIDER_SELLING", "INSIDER_BUYING", etc.
@@ -45,39 +306,175 @@ class InsiderSignal:
     confidence: float
     threshold_exceeded: bool
     threshold_value: float
-    details: Dict
+    details: SignalDetails
     filing_url: str
     detected_at: str
 
+class Form4Target:
+    """
+    lxml parser target that builds InsiderTransactions from Form 4 parse
+    events, without materializing an element tree
+    
+    Usage:
+        parser = etree.XMLParser(target=Form4Target())
+        parser.feed(content)
+        transactions = parser.close()
+    """
+    
+    # Element paths (relative to their section) whose text we collect
+    OWNER_FIELDS = {
+        ('reportingOwnerId', 'rptOwnerName'): 'insider_name',
+        ('reportingOwnerRelationship', 'officerTitle'): 'title',
+    }
+    TRANSACTION_FIELDS = {
+        ('transactionDate', 'value'): 'transaction_date',
+        ('transactionCoding', 'transactionCode'): 'transaction_code',
+        ('transactionAmounts', 'transactionShares', 'value'): 'shares',
+        ('postTransactionAmounts', 'sharesOwnedFollowingTransaction', 'value'): 'shares_owned_after',
+    }
+    
+    def __init__(self):
+        self.transactions: List[InsiderTransaction] = []
+        self.insider_name = "Unknown"
+        self.title = "Unknown"
+        self._path: List[str] = []
+        self._section: Optional[str] = None  # 'reportingOwner' or 'nonDerivativeTransaction'
+        self._section_depth = 0
+        self._fields: Dict[str, str] = {}
+        self._text: List[str] = []
+    
+    def start(self, tag, attrib):
+        self._path.append(tag)
+        self._text = []
+        
+        if tag in ('reportingOwner', 'nonDerivativeTransaction'):
+            self._section = tag
+            self._section_depth = len(self._path)
+            self._fields = {}
+    
+    def data(self, data):
+        if self._section:
+            self._text.append(data)
+    
+    def end(self, tag):
+        if self._section:
+            if len(self._path) == self._section_depth:
+                self._end_section()
+            else:
+                fields = self.OWNER_FIELDS if self._section == 'reportingOwner' else self.TRANSACTION_FIELDS
+                name = fields.get(tuple(self._path[self._section_depth:]))
+                if name:
+                    self._fields[name] = ''.join(self._text).strip()
+        
+        self._path.pop()
+        self._text = []
+    
+    def close(self) -> List[InsiderTransaction]:
+        return self.transactions
+    
+    def _end_section(self):
+        fields = self._fields
+        
+        if self._section == 'reportingOwner':
+            # Insider information precedes the transaction table
+            self.insider_name = fields.get('insider_name') or "Unknown"
+            self.title = fields.get('title') or "Unknown"
+        elif all(fields.get(name) for name in self.TRANSACTION_FIELDS.values()):
+            # Determine if sale or purchase
+            is_sale = fields['transaction_code'] in ['S', 'F']  # S=Sale, F=Payment of exercise price
+            shares = int(fields['shares'])
+            
+            self.transactions.append(InsiderTransaction.from_api(
+                insider_name=self.insider_name,
+                title=self.title,
+                transaction_date=fields['transaction_date'],
+                shares_sold=shares if is_sale else 0,
+                shares_bought=shares if not is_sale else 0,
+                shares_owned_after=int(fields['shares_owned_after']),
+                transaction_type="Sale" if is_sale else "Purchase"
+            ))
+        
+        self._section = None
+
 class SECFilingAnalyzer:
     """Analyzes SEC filings for insider signals"""
     
+    # Kept on the class for existing callers; the table lives at module scope
+    ROLE_WEIGHTS = ROLE_WEIGHTS
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key
         if api_key and OPENAI_AVAILABLE:
-            self.client = OpenAI(api_key=api_key)
+            from openai import AsyncOpenAI
+            self.client = AsyncOpenAI(api_key=api_key)
         else:
             self.client = None
         
-        # Connect to IPFS
-        try:
-            self.ipfs = ipfshttpclient.connect('/ip4/127.0.0.1/tcp/5001')
-            print("✅ Connected to IPFS")
-        except Exception as e:
-            print(f"⚠️  IPFS connection failed: {e}")
-            self.ipfs = None
+        # (cik, filing_type) -> (ETag, Last-Modified, filing URL) of the EDGAR feed
+        self._feed_cache = LRUCache()
+        # Filing URL -> raw filing (EDGAR archive documents never change)
+        self._filing_cache = LRUCache()
+        # SHA-256 of filing -> parsed transactions
+        self._parse_cache = LRUCache()
+        # SHA-256 of AI prompt -> analysis result
+        self._ai_cache = LRUCache()
+        # (transaction contents, threshold) -> detected signal (or None)
+        self._signal_cache = LRUCache()
+        # SHA-256 of filing -> IPFS CID it was pinned under
+        self.ipfs_cids = LRUCache()
+        
+        # Prover worker is started on the first proof request
+        self._prover: Optional[subprocess.Popen] = None
+        self._prover_lock = threading.Lock()
+        
+        # Process pool for batch analysis is started on the first batch
+        self._pool: Optional[ProcessPoolExecutor] = None
     
-    def download_sec_filing(self, cik: str, filing_type: str = "4") -> Optional[str]:
+    async def download_sec_filing(
+        self,
+        cik: str,
+        filing_type: str = "4",
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> Optional[str]:
         """
         Download SEC filing from EDGAR
         
         Args:
             cik: Company CIK number
             filing_type: Type of filing (4, 10-K, 10-Q, etc.)
+            session: Shared HTTP session (a temporary one is created if omitted)
         
         Returns:
             Filing content as string
         """
+        filing_bytes = await self.download_sec_filing_bytes(cik, filing_type, session)
+        
+        if filing_bytes is None:
+            return None
+        
+        return filing_bytes.decode('utf-8', errors='replace')
+    
+    async def download_sec_filing_bytes(
+        self,
+        cik: str,
+        filing_type: str = "4",
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> Optional[bytes]:
+        """
+        Download SEC filing from EDGAR without decoding it
+        
+        Args:
+            cik: Company CIK number
+            filing_type: Type of filing (4, 10-K, 10-Q, etc.)
+            session: Shared HTTP session (a temporary one is created if omitted)
+        
+        Returns:
+            Raw filing content
+        """
+        if session is None:
+            async with create_http_session() as session:
+                return await self.download_sec_filing_bytes(cik, filing_type, session)
+        
         # SEC EDGAR API
         base_url = "https://www.sec.gov/cgi-bin/browse-edgar"
         
@@ -95,69 +492,200 @@ class SECFilingAnalyzer:
             "output": "atom"
         }
         
+        # Revalidate the feed instead of re-downloading it when we have validators
+        feed_key = (cik, filing_type)
+        cached_feed = self._feed_cache.get(feed_key)
+        feed_headers = dict(headers)
+        if cached_feed:
+            etag, last_modified, _ = cached_feed
+            if etag:
+                feed_headers["If-None-Match"] = etag
+            if last_modified:
+                feed_headers["If-Modified-Since"] = last_modified
+        
         try:
-            response = requests.get(base_url, params=params, headers=headers)
-            response.raise_for_status()
+            status, response_headers, feed = await self._edgar_get(
+                session, base_url, params=params, headers=feed_headers
+            )
             
-            # Parse XML to get filing URL
-            soup = BeautifulSoup(response.content, 'xml')
-            filing_url = soup.find('filing-href')
+            if status == 304 and cached_feed:
+                filing_url = cached_feed[2]
+            else:
+                if status >= 400:
+                    raise RuntimeError(f"EDGAR feed request failed with HTTP {status}")
+                
+                # Parse Atom feed to get filing URL
+                root = etree.fromstring(feed)
+                href = root.find('.//atom:filing-href', namespaces=ATOM_NS)
+                filing_url = href.text.strip() if href is not None and href.text else None
+                
+                etag = response_headers.get("ETag")
+                last_modified = response_headers.get("Last-Modified")
+                if filing_url and (etag or last_modified):
+                    self._feed_cache.put(feed_key, (etag, last_modified, filing_url))
             
             if filing_url:
-                filing_response = requests.get(filing_url.text, headers=headers)
-                return filing_response.text
+                filing = self._filing_cache.get(filing_url)
+                
+                if filing is None:
+                    status, _, filing = await self._edgar_get(session, filing_url, headers=headers)
+                    if status >= 400:
+                        raise RuntimeError(f"EDGAR filing request failed with HTTP {status}")
+                    self._filing_cache.put(filing_url, filing)
+                
+                return filing
             
         except Exception as e:
             print(f"Error downloading filing: {e}")
         
         return None
     
-    def parse_form4_transactions(self, filing_content: str) -> List[InsiderTransaction]:
+    async def _edgar_get(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None
+    ) -> Tuple[int, Mapping[str, str], bytes]:
+        """
+        GET an EDGAR URL, retrying with exponential backoff
+        
+        Throttling/5xx responses and connection errors are retried up to
+        EDGAR_MAX_RETRIES times, sleeping EDGAR_BACKOFF_FACTOR * 2**attempt seconds.
+        
+        Returns:
+            Tuple of (status, response headers, body)
+        """
+        for attempt in range(EDGAR_MAX_RETRIES + 1):
+            last_attempt = attempt == EDGAR_MAX_RETRIES
+            
+            try:
+                async with session.get(url, params=params, headers=headers) as response:
+                    if response.status not in EDGAR_RETRY_STATUSES or last_attempt:
+                        return response.status, response.headers, await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if last_attempt:
+                    raise
+            
+            await asyncio.sleep(EDGAR_BACKOFF_FACTOR * 2 ** attempt)
+        
+        raise RuntimeError(f"EDGAR request to {url} exhausted its retries")
+    
+    def parse_form4_transactions(self, filing_content: Union[str, bytes]) -> List[InsiderTransaction]:
         """
         Parse Form 4 insider transactions
         
         Args:
-            filing_content: Raw Form 4 XML/HTML content
+            filing_content: Raw Form 4 XML/HTML content (bytes are parsed as-is)
         
         Returns:
             List of InsiderTransaction objects
         """
-        transactions = []
+        if isinstance(filing_content, str):
+            filing_content = filing_content.encode()
+        
+        # Identical filings are only parsed once
+        cache_key = hashlib.sha256(filing_content).digest()
+        cached = self._parse_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
+        # Transactions are built from parse events; no element tree is kept
+        target = Form4Target()
         
         try:
-            soup = BeautifulSoup(filing_content, 'xml')
-            
-            # Extract insider information
-            insider_name = soup.find('reportingOwnerName')
-            insider_title = soup.find('reportingOwnerTitle')
+            parser = etree.XMLParser(target=target)
+            parser.feed(filing_content)
+            parser.close()
             
-            # Find all transactions
-            for transaction in soup.find_all('nonDerivativeTransaction'):
-                trans_date = transaction.find('transactionDate')
-                trans_code = transaction.find('transactionCode')
-                shares = transaction.find('transactionShares')
-                shares_owned = transaction.find('sharesOwnedFollowingTransaction')
-                
-                if all([trans_date, trans_code, shares, shares_owned]):
-                    # Determine if sale or purchase
-                    code = trans_code.find('value').text.strip()
-                    is_sale = code in ['S', 'F']  # S=Sale, F=Payment of exercise price
-                    
-                    trans = InsiderTransaction(
-                        insider_name=insider_name.text.strip() if insider_name else "Unknown",
-                        title=insider_title.text.strip() if insider_title else "Unknown",
-                        transaction_date=trans_date.find('value').text.strip(),
-                        shares_sold=int(shares.find('value').text) if is_sale else 0,
-                        shares_bought=int(shares.find('value').text) if not is_sale else 0,
-                        shares_owned_after=int(shares_owned.find('value').text),
-                        transaction_type="Sale" if is_sale else "Purchase"
-                    )
-                    transactions.append(trans)
+            self._parse_cache.put(cache_key, tuple(target.transactions))
             
         except Exception as e:
             print(f"Error parsing Form 4: {e}")
         
-        return transactions
+        return target.transactions
+    
+    async def parse_form4_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        sink: Optional[IO[bytes]] = None
+    ) -> Tuple[List[InsiderTransaction], str]:
+        """
+        Parse and hash a Form 4 in a single pass over streamed chunks
+        
+        Args:
+            chunks: Raw filing content in chunks
+            sink: Optional file that receives a copy of every chunk
+        
+        Returns:
+            Tuple of (transactions, SHA-256 hex digest of the content)
+        """
+        hasher = hashlib.sha256()
+        target = Form4Target()
+        parser = etree.XMLParser(target=target)
+        failed = False
+        
+        async for chunk in chunks:
+            hasher.update(chunk)
+            if sink is not None:
+                sink.write(chunk)
+            
+            if not failed:
+                try:
+                    parser.feed(chunk)
+                except Exception as e:
+                    print(f"Error parsing Form 4: {e}")
+                    failed = True
+        
+        if not failed:
+            try:
+                parser.close()
+                self._parse_cache.put(hasher.digest(), tuple(target.transactions))
+            except Exception as e:
+                print(f"Error parsing Form 4: {e}")
+        
+        return target.transactions, hasher.hexdigest()
+    
+    def parse_form4_transactions_arrays(self, filing_content: Union[str, bytes]) -> Dict[str, np.ndarray]:
+        """
+        Parse Form 4 insider transactions into column arrays
+        
+        Args:
+            filing_content: Raw Form 4 XML/HTML content
+        
+        Returns:
+            Dict of NumPy arrays (see transactions_to_arrays)
+        """
+        return self.transactions_to_arrays(self.parse_form4_transactions(filing_content))
+    
+    @staticmethod
+    def transactions_to_arrays(transactions: List[InsiderTransaction]) -> Dict[str, np.ndarray]:
+        """
+        Transpose transactions into a structure of arrays
+        
+        Args:
+            transactions: List of insider transactions
+        
+        Returns:
+            Dict with one NumPy array per InsiderTransaction field used in
+            detection (all but transaction_type), plus "insider_id" (interned
+            int32 id of each insider name)
+        """
+        # Insider name -> small integer id, local to this call
+        interner: Dict[str, int] = {}
+        return {
+            "insider_name": np.array([t.insider_name for t in transactions], dtype=object),
+            "insider_id": np.fromiter(
+                (interner.setdefault(t.insider_name, len(interner)) for t in transactions),
+                dtype=np.int32,
+                count=len(transactions)
+            ),
+            "title": np.array([t.title for t in transactions], dtype=object),
+            "transaction_date": np.array([t.transaction_date for t in transactions], dtype=np.int64),
+            "shares_sold": np.array([t.shares_sold for t in transactions], dtype=np.int64),
+            "shares_bought": np.array([t.shares_bought for t in transactions], dtype=np.int64),
+            "shares_owned_after": np.array([t.shares_owned_after for t in transactions], dtype=np.int64),
+        }
     
     def detect_insider_selling_signal(
         self,
@@ -177,45 +705,49 @@ class SECFilingAnalyzer:
         if not transactions:
             return None
         
-        # Role importance weights (based on academic research)
-        # CEO/CFO sales are more predictive than Director sales
-        ROLE_WEIGHTS = {
-            'ceo': 1.5,
-            'chief executive officer': 1.5,
-            'cfo': 1.4,
-            'chief financial officer': 1.4,
-            'coo': 1.3,
-            'chief operating officer': 1.3,
-            'president': 1.3,
-            'cto': 1.2,
-            'chief technology officer': 1.2,
-            'director': 1.0,
-            'officer': 0.9,
-            'insider': 0.8,
-            '10% owner': 0.7  # Large shareholders, less predictive
-        }
+        # Re-analyzing the same filing (e.g. for several bounty checks) is common
+        cache_key = (tuple(map(_transaction_key, transactions)), threshold)
+        signal = self._signal_cache.get(cache_key, _MISSING)
         
-        # Calculate total selling activity with role weighting
-        total_sold = 0
-        total_bought = 0
-        weighted_sold = 0
-        role_multiplier = 1.0
-        
-        for t in transactions:
-            # Get role weight
-            title_lower = t.title.lower()
-            weight = 1.0
-            for role, w in ROLE_WEIGHTS.items():
-                if role in title_lower:
-                    weight = max(weight, w)  # Use highest matching weight
-            
-            total_sold += t.shares_sold
-            total_bought += t.shares_bought
-            weighted_sold += t.shares_sold * weight
-            role_multiplier = max(role_multiplier, weight)
+        if signal is _MISSING:
+            signal = self.detect_insider_selling_signal_arrays(
+                self.transactions_to_arrays(transactions),
+                threshold
+            )
+            self._signal_cache.put(cache_key, signal)
+        
+        if signal is None:
+            return None
+        
+        # Signals are immutable, so a hit only needs this detection's timestamp
+        return replace(signal, detected_at=datetime.now().isoformat())
+    
+    def detect_insider_selling_signal_arrays(
+        self,
+        arrays: Dict[str, np.ndarray],
+        threshold: float = 40.0
+    ) -> Optional[InsiderSignal]:
+        """
+        Detect abnormal insider selling from column arrays
+        
+        Args:
+            arrays: Transactions as returned by transactions_to_arrays
+            threshold: Percentage threshold (default 40%)
+        
+        Returns:
+            InsiderSignal if detected, None otherwise
+        """
+        shares_sold = arrays["shares_sold"]
+        num_transactions = len(shares_sold)
+        
+        if num_transactions == 0:
+            return None
+        
+        # Calculate total selling activity
+        total_sold = int(shares_sold.sum())
         
         # Get most recent ownership
-        recent_ownership = transactions[-1].shares_owned_after
+        recent_ownership = int(arrays["shares_owned_after"][-1])
         
         # Calculate percentage sold (unweighted)
         if recent_ownership > 0:
@@ -223,22 +755,43 @@ class SECFilingAnalyzer:
         else:
             percentage_sold = 0
         
-        # Apply role multiplier to effective percentage
-        # High-ranking executives selling = higher effective signal
-        effective_percentage = percentage_sold * role_multiplier
+        # Even the highest role weight cannot reach the threshold: skip the rest
+        if percentage_sold * MAX_ROLE_WEIGHT < threshold:
+            return None
+        
+        # Distinct insiders (by interned id) and titles, with first occurrence and per-row codes
+        insider_ids, name_first = np.unique(arrays["insider_id"], return_index=True)
+        titles, title_first, title_codes = np.unique(
+            arrays["title"], return_index=True, return_inverse=True
+        )
+        
+        # Role weight per transaction via a per-title lookup table
+        title_weights = np.array([self._title_weight(title) for title in titles])
+        weights = title_weights[title_codes]
+        
+        total_bought = int(arrays["shares_bought"].sum())
+        
+        # Role-weighted selling activity; the role multiplier scales the effective
+        # percentage (high-ranking executives selling = higher effective signal)
+        role_multiplier, effective_percentage = _score_kernel(
+            weights, float(percentage_sold)
+        )
+        role_multiplier = float(role_multiplier)
+        effective_percentage = float(effective_percentage)
         
         # Check if threshold exceeded
         threshold_exceeded = effective_percentage >= threshold
         
         if threshold_exceeded:
             # Count unique insiders
-            unique_insiders = len(set(t.insider_name for t in transactions))
+            unique_insiders = int(insider_ids.size)
             
-            # Detect time clustering (all within 30 days = suspicious)
-            dates = [datetime.fromisoformat(t.transaction_date) for t in transactions]
-            if len(dates) > 1:
-                date_range_days = (max(dates) - min(dates)).days
-                is_clustered = date_range_days <= 30
+            # Detect time clustering (all within 30 days = suspicious); the span
+            # of the window is one O(n) min/max reduction, no pairwise comparison
+            dates = arrays["transaction_date"]
+            if num_transactions > 1:
+                date_range_days = int(np.ptp(dates))  # day ordinals, single reduction
+                is_clustered = date_range_days <= CLUSTER_WINDOW_DAYS
             else:
                 is_clustered = False
             
@@ -258,26 +811,109 @@ class SECFilingAnalyzer:
                 confidence=confidence,
                 threshold_exceeded=True,
                 threshold_value=percentage_sold,  # Report actual, not effective
-                details={
-                    "total_shares_sold": total_sold,
-                    "total_shares_bought": total_bought,
-                    "percentage_sold": round(percentage_sold, 2),
-                    "effective_percentage": round(effective_percentage, 2),
-                    "threshold": threshold,
-                    "num_transactions": len(transactions),
-                    "num_unique_insiders": unique_insiders,
-                    "insiders": list(set(t.insider_name for t in transactions)),
-                    "roles": list(set(t.title for t in transactions)),
-                    "role_multiplier": round(role_multiplier, 2),
-                    "time_clustered": is_clustered if len(dates) > 1 else None,
-                    "date_range_days": date_range_days if len(dates) > 1 else 0
-                },
+                details=SignalDetails(
+                    total_shares_sold=total_sold,
+                    total_shares_bought=total_bought,
+                    percentage_sold=round(percentage_sold, 2),
+                    effective_percentage=round(effective_percentage, 2),
+                    threshold=threshold,
+                    num_transactions=num_transactions,
+                    num_unique_insiders=unique_insiders,
+                    insiders=tuple(arrays["insider_name"][np.sort(name_first)].tolist()),  # first-seen order
+                    roles=tuple(titles[np.argsort(title_first)].tolist()),
+                    role_multiplier=round(role_multiplier, 2),
+                    time_clustered=is_clustered if num_transactions > 1 else None,
+                    date_range_days=date_range_days if num_transactions > 1 else 0
+                ),
                 filing_url="",
                 detected_at=datetime.now().isoformat()
             )
         
         return None
     
+    async def analyze_many(
+        self,
+        contents: List[bytes],
+        threshold: float = 40.0
+    ) -> List[Union[InsiderSignal, None, BaseException]]:
+        """
+        Parse and analyze many Form 4 filings in parallel worker processes
+        
+        Args:
+            contents: Raw Form 4 XML documents
+            threshold: Percentage threshold (default 40%)
+        
+        Returns:
+            Detected signal (or None) for each filing, in input order; a filing
+            whose analysis failed gets the exception instead
+        """
+        if not contents:
+            return []
+        
+        pool = self._get_pool()
+        results = await self._analyze_in_pool(pool, contents, threshold)
+        
+        broken = [i for i, result in enumerate(results) if isinstance(result, BrokenProcessPool)]
+        if broken:
+            # A dead worker breaks the whole pool; restart it and retry those filings once
+            self._discard_pool(pool)
+            pool = self._get_pool()
+            retried = await self._analyze_in_pool(pool, [contents[i] for i in broken], threshold)
+            for i, result in zip(broken, retried):
+                results[i] = result
+            if any(isinstance(result, BrokenProcessPool) for result in retried):
+                self._discard_pool(pool)
+        
+        return results
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Get the analysis worker pool, starting it if needed"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS)
+        return self._pool
+    
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Shut down a broken worker pool so the next batch starts a fresh one"""
+        pool.shutdown(wait=False, cancel_futures=True)
+        if self._pool is pool:
+            self._pool = None
+    
+    @staticmethod
+    async def _analyze_in_pool(
+        pool: ProcessPoolExecutor,
+        contents: List[bytes],
+        threshold: float
+    ) -> List[Union[InsiderSignal, None, BaseException]]:
+        """Run _parse_and_detect for each filing in the pool, capturing per-filing errors"""
+        loop = asyncio.get_running_loop()
+        
+        async def analyze(content: bytes) -> Optional[InsiderSignal]:
+            # Submitting to a broken pool raises here, so it is captured per filing too
+            return await loop.run_in_executor(pool, _parse_and_detect, content, threshold)
+        
+        return await asyncio.gather(
+            *(analyze(content) for content in contents),
+            return_exceptions=True
+        )
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _title_weight(title: str) -> float:
+        """
+        Get the role weight for an insider title
+        
+        Memoized across calls since the same officers file repeatedly.
+        
+        Args:
+            title: Insider title as reported in the filing
+        
+        Returns:
+            Highest matching role weight (at least 1.0)
+        """
+        title = " ".join(title.lower().translate(_TITLE_NORMALIZATION).split())
+        weight = _TITLE_CANON.get(title)
+        return weight if weight is not None else _scan_role_weight(title)
+    
     def _calculate_confidence(
         self,
         percentage_sold: float,
@@ -327,7 +963,7 @@ class SECFilingAnalyzer:
         # Cap at 0.99 (never claim 100% certainty)
         return min(confidence, 0.99)
     
-    def analyze_with_ai(self, filing_content: str, signal_type: str) -> Dict:
+    async def analyze_with_ai(self, filing_content: str, signal_type: str) -> Dict:
         """
         Use AI to analyze filing for specific signals
         
@@ -375,43 +1011,122 @@ class SECFilingAnalyzer:
             """
         }
         
+        prompt = prompts.get(signal_type, "") + "\n\n" + self._prompt_excerpt(filing_content, signal_type)
+        
+        # Repeated analyses of the same filing are free
+        cache_key = hashlib.sha256(prompt.encode()).digest()
+        cached = self._ai_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are an expert SEC filing analyzer."},
-                    {"role": "user", "content": prompts.get(signal_type, "") + "\n\n" + filing_content[:8000]}
+                    {"role": "user", "content": prompt}
                 ],
                 response_format={"type": "json_object"}
             )
             
-            return json.loads(response.choices[0].message.content)
+            result = orjson.loads(response.choices[0].message.content)
+            self._ai_cache.put(cache_key, result)
+            return dict(result)
             
         except Exception as e:
             return {"error": str(e)}
     
-    def upload_to_ipfs(self, content: str) -> Optional[str]:
+    def _prompt_excerpt(self, filing_content: str, signal_type: str) -> str:
+        """
+        Select the part of a filing that is relevant for an AI signal type
+        
+        Args:
+            filing_content: Filing text content
+            signal_type: Type of signal to detect
+        
+        Returns:
+            Filing excerpt of at most AI_PROMPT_CHARS characters
+        """
+        if signal_type == "INSIDER_SELLING":
+            table = FORM4_TABLE_RE.search(filing_content)
+            if table:
+                return table.group(0)[:AI_PROMPT_CHARS]
+        
+        item = AI_SIGNAL_ITEMS.get(signal_type)
+        if item:
+            section = self._item_sections(filing_content).get(item)
+            if section:
+                return section[:AI_PROMPT_CHARS]
+        
+        return filing_content[:AI_PROMPT_CHARS]
+    
+    @staticmethod
+    def _item_sections(filing_content: str) -> Dict[str, str]:
+        """
+        Split a filing into its Item sections
+        
+        Args:
+            filing_content: Filing text content
+        
+        Returns:
+            Section text keyed by item number (e.g. "1A"), running up to the next header
+        """
+        headers = [
+            (m.group(1).upper(), m.start(), m.end())
+            for m in ITEM_HEADER_RE.finditer(filing_content)
+        ]
+        
+        sections: Dict[str, str] = {}
+        for i, (item, _, end) in enumerate(headers):
+            stop = headers[i + 1][1] if i + 1 < len(headers) else len(filing_content)
+            text = filing_content[end:stop].strip()
+            
+            # The table of contents also lists every item, so keep the longest body
+            if len(text) > len(sections.get(item, "")):
+                sections[item] = text
+        
+        return sections
+    
+    async def upload_to_ipfs(
+        self,
+        content: Union[str, bytes, IO[bytes]],
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> Optional[str]:
         """
         Upload filing to IPFS
         
         Args:
-            content: Filing content
+            content: Filing content (file objects are streamed from their current position)
+            session: Shared HTTP session (a temporary one is created if omitted)
         
         Returns:
             IPFS hash
         """
-        if not self.ipfs:
-            print("⚠️  IPFS not available")
-            return None
+        if session is None:
+            async with create_http_session() as session:
+                return await self.upload_to_ipfs(content, session)
+        
+        body: Union[bytes, AsyncIterator[bytes]]
+        if isinstance(content, str):
+            body = content.encode()
+        elif isinstance(content, bytes):
+            body = content
+        else:
+            body = _iter_file(content)
+        
+        form = aiohttp.FormData()
+        form.add_field('file', body, filename='filing')
         
         try:
-            result = self.ipfs.add_str(content)
-            return result
+            async with session.post(f"{IPFS_API_URL}/add", data=form) as response:
+                response.raise_for_status()
+                result = await response.json(content_type=None)
+                return result["Hash"]
         except Exception as e:
             print(f"Error uploading to IPFS: {e}")
             return None
     
-    def generate_zk_proof(
+    async def generate_zk_proof(
         self,
         filing_hash: str,
         threshold: int,
@@ -431,22 +1146,12 @@ class SECFilingAnalyzer:
             Proof bytes
         """
         # IMPORTANT: Convert filing hash to field elements properly
-        # BN254 field modulus: 21888242871839275222246405745257275088548364400416034343698204186575808495617
-        # We split the 256-bit hash into two 128-bit values and combine securely
-        
-        filing_hash_int = int(filing_hash, 16) if filing_hash.startswith('0x') else int(filing_hash, 16)
-        
-        # Split into high and low 128 bits (no truncation!)
-        filing_hash_high = filing_hash_int >> 128
-        filing_hash_low = filing_hash_int & ((1 << 128) - 1)
-        
-        # Combine using keccak256 (same as Solidity) and reduce modulo field size
-        from web3 import Web3
-        combined_bytes = filing_hash_high.to_bytes(16, 'big') + filing_hash_low.to_bytes(16, 'big')
-        combined_hash = Web3.keccak(combined_bytes)  # ✅ FIXED: Use keccak256 to match contract
+        # The full 256-bit hash (high || low 128 bits, no truncation!) is
+        # combined using keccak256 (same as Solidity) and reduced modulo field size
+        combined_bytes = self._hash256_bytes(filing_hash)
+        combined_hash = keccak.new(digest_bits=256, data=combined_bytes).digest()
         
         # Convert to field element (mod BN254 field)
-        BN254_FIELD_MODULUS = 21888242871839275222246405745257275088548364400416034343698204186575808495617
         filing_hash_field = int.from_bytes(combined_hash, 'big') % BN254_FIELD_MODULUS
         
         # Create input JSON
@@ -455,56 +1160,149 @@ class SECFilingAnalyzer:
             "threshold": threshold,
             "totalShares": total_shares,
             "sharesSold": shares_sold,
-            "salt": str(int.from_bytes(os.urandom(32), 'big') % BN254_FIELD_MODULUS)
+            "salt": str(int.from_bytes(os.urandom(31), 'big'))  # 248 bits, always < field modulus
         }
         
-        # Write input to file
-        input_file = "/tmp/input.json"
-        with open(input_file, 'w') as f:
-            json.dump(input_data, f)
-        
         try:
-            # Generate witness
-            witness_cmd = [
-                "node",
-                "circuits/build/insider_selling_js/generate_witness.js",
-                "circuits/build/insider_selling_js/insider_selling.wasm",
-                input_file,
-                "/tmp/witness.wtns"
-            ]
-            subprocess.run(witness_cmd, check=True, capture_output=True)
-            
-            # Generate proof
-            proof_cmd = [
-                "snarkjs", "groth16", "prove",
-                "circuits/build/insider_selling_final.zkey",
-                "/tmp/witness.wtns",
-                "/tmp/proof.json",
-                "/tmp/public.json"
-            ]
-            subprocess.run(proof_cmd, check=True, capture_output=True)
-            
-            # Read proof and public signals
-            with open("/tmp/proof.json", 'r') as f:
-                proof_data = json.load(f)
-            
-            with open("/tmp/public.json", 'r') as f:
-                public_signals = json.load(f)
+            # Prove in the persistent worker without blocking the event loop
+            result = await asyncio.to_thread(self._prove_with_worker, input_data)
+            proof_data = result["proof"]
+            public_signals = result["publicSignals"]
             
             # Verify public signals match our inputs (critical security check)
             assert public_signals[0] == str(filing_hash_field), "Filing hash mismatch in proof"
             assert public_signals[1] == str(threshold), "Threshold mismatch in proof"
             
             # Convert proof to bytes (simplified)
-            proof_bytes = json.dumps(proof_data).encode()
+            proof_bytes = orjson.dumps(proof_data)
             return proof_bytes
             
-        except subprocess.CalledProcessError as e:
-            print(f"Error generating proof: {e.stderr.decode()}")
-            return None
         except Exception as e:
-            print(f"Error: {e}")
+            print(f"Error generating proof: {e}")
             return None
+    
+    @staticmethod
+    def _hash256_bytes(filing_hash: str) -> bytes:
+        """
+        Decode a hex filing hash to its 32 big-endian bytes
+        
+        Args:
+            filing_hash: 256-bit hash as hex, with or without 0x prefix
+        
+        Returns:
+            32-byte hash
+        """
+        hash_bytes = bytes.fromhex(filing_hash.removeprefix('0x').rjust(64, '0'))
+        if len(hash_bytes) != 32:
+            raise ValueError(f"Filing hash is not 256 bits: {filing_hash}")
+        return hash_bytes
+    
+    def generate_zk_proof_sync(
+        self,
+        filing_hash: str,
+        threshold: int,
+        total_shares: int,
+        shares_sold: int
+    ) -> Optional[bytes]:
+        """
+        Blocking wrapper around generate_zk_proof for callers without an event loop
+        
+        Returns:
+            Proof bytes
+        """
+        return asyncio.run(
+            self.generate_zk_proof(filing_hash, threshold, total_shares, shares_sold)
+        )
+    
+    def _prove_with_worker(self, input_data: Dict) -> Dict:
+        """
+        Send one circuit input to the prover worker and wait for its answer
+        
+        Args:
+            input_data: Circuit input signals
+        
+        Returns:
+            Dict with "proof" and "publicSignals"
+        """
+        with self._prover_lock:
+            if self._prover is None or self._prover.poll() is not None:
+                self._prover = subprocess.Popen(
+                    ["node", PROVER_WORKER],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE
+                )
+            
+            stdin, stdout = self._prover.stdin, self._prover.stdout
+            if stdin is None or stdout is None:
+                raise RuntimeError("Prover worker has no pipes")
+            
+            stdin.write(orjson.dumps(input_data) + b"\n")
+            stdin.flush()
+            
+            # Read on a helper thread so a wedged worker cannot hold the lock forever
+            lines: List[bytes] = []
+            reader = threading.Thread(target=lambda: lines.append(stdout.readline()), daemon=True)
+            reader.start()
+            reader.join(PROVER_TIMEOUT)
+            
+            if reader.is_alive():
+                # Killing the worker closes its stdout, which ends the read
+                self._prover.kill()
+                self._prover.wait()
+                self._prover = None
+                raise RuntimeError(f"Prover worker did not answer within {PROVER_TIMEOUT}s")
+            
+            response = lines[0]
+        
+        if not response:
+            raise RuntimeError("Prover worker exited (are the circuits built?)")
+        
+        result = orjson.loads(response)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        
+        return result
+    
+    def close_prover(self):
+        """Stop the prover worker if it is running"""
+        with self._prover_lock:
+            if self._prover is not None and self._prover.poll() is None:
+                if self._prover.stdin is not None:
+                    self._prover.stdin.close()
+                try:
+                    # The worker exits once it has finished any queued proof
+                    self._prover.wait(timeout=PROVER_SHUTDOWN_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    self._prover.kill()
+                    self._prover.wait()
+            self._prover = None
+    
+    def close_pool(self):
+        """Shut down the batch analysis worker processes if they are running"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+# Analyzer used inside each batch worker process
+_worker_analyzer: Optional[SECFilingAnalyzer] = None
+
+def _parse_and_detect(filing_content: bytes, threshold: float) -> Optional[InsiderSignal]:
+    """
+    Parse a Form 4 and detect a selling signal (runs in a pool worker)
+    
+    Args:
+        filing_content: Raw Form 4 XML content
+        threshold: Percentage threshold
+    
+    Returns:
+        InsiderSignal if detected, None otherwise
+    """
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = SECFilingAnalyzer()
+    
+    transactions = _worker_analyzer.parse_form4_transactions(filing_content)
+    return _worker_analyzer.detect_insider_selling_signal(transactions, threshold)
 
 def main():
     """Example usage"""
@@ -515,7 +1313,7 @@ def main():
     
     # Mock data for demonstration
     mock_transactions = [
-        InsiderTransaction(
+        InsiderTransaction.from_api(
             insider_name="John Doe",
             title="CEO",
             transaction_date="2025-01-15",
@@ -524,7 +1322,7 @@ def main():
             shares_owned_after=70000,
             transaction_type="Sale"
         ),
-        InsiderTransaction(
+        InsiderTransaction.from_api(
             insider_name="Jane Smith",
             title="CFO",
             transaction_date="2025-01-16",
@@ -543,7 +1341,7 @@ def main():
         print(f"Type: {signal.signal_type}")
         print(f"Confidence: {signal.confidence:.2%}")
         print(f"Threshold Value: {signal.threshold_value:.2f}%")
-        print(f"Details: {json.dumps(signal.details, indent=2)}")
+        print(f"Details: {json.dumps(dict(signal.details), indent=2)}")
         
         # Generate ZK proof
         filing_hash = hashlib.sha256("mock_filing_content".encode()).hexdigest()
@@ -551,7 +1349,7 @@ def main():
         shares_sold = 80000
         
         print(f"\n🔐 Generating ZK proof...")
-        proof = analyzer.generate_zk_proof(filing_hash, 40, total_shares, shares_sold)
+        proof = analyzer.generate_zk_proof_sync(filing_hash, 40, total_shares, shares_sold)
         
         if proof:
             print(f"✅ Proof generated: {len(proof)} bytes")
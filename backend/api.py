@@ -3,20 +3,33 @@ FastAPI Server for Zero-Knowledge Insider Signal Verifier
 Provides REST API for signal detection and verification
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
+from typing import IO, Any, AsyncIterator, List, Optional, Dict, Tuple, Union
+import os
+import asyncio
 import hashlib
 import json
+import tempfile
 from datetime import datetime
+import aiohttp
 
-from analyzer import SECFilingAnalyzer, InsiderSignal, InsiderTransaction
+from analyzer import (
+    SECFilingAnalyzer,
+    InsiderSignal,
+    InsiderTransaction,
+    STREAM_CHUNK_SIZE,
+    create_http_session
+)
 
 app = FastAPI(
     title="ZK Insider Signal Verifier API",
     description="Zero-knowledge proof verification for insider trading signals",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -28,8 +41,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize analyzer
-analyzer = SECFilingAnalyzer()
+# Compress larger JSON payloads (signal lists, OpenAPI schema)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Initialize analyzer (AI analysis is enabled when OPENAI_API_KEY is set)
+analyzer = SECFilingAnalyzer(api_key=os.getenv("OPENAI_API_KEY"))
+
+# Shared HTTP session for SEC EDGAR requests (opened on startup)
+http_session: Optional[aiohttp.ClientSession] = None
+
+# SEC EDGAR fair-access policy allows 10 requests per second
+EDGAR_MAX_CONCURRENCY = 10
+
+# Concurrent OpenAI requests per AI batch
+OPENAI_MAX_CONCURRENCY = 5
+
+# Uploaded filings larger than this are spooled to disk while awaiting IPFS
+UPLOAD_SPOOL_SIZE = 1024 * 1024
+
+@app.on_event("startup")
+async def open_http_session():
+    """Open the pooled HTTP session used for EDGAR and IPFS requests"""
+    global http_session
+    http_session = create_http_session()
+
+@app.on_event("startup")
+async def cache_openapi_schema():
+    """Build the OpenAPI schema once; /openapi.json and /docs reuse it"""
+    app.openapi_schema = app.openapi()
+
+@app.on_event("shutdown")
+async def close_http_session():
+    """Close the pooled HTTP session, the prover worker and the analysis pool"""
+    try:
+        if http_session:
+            await http_session.close()
+        analyzer.close_prover()
+    finally:
+        analyzer.close_pool()
 
 # Request/Response Models
 class AnalyzeFilingRequest(BaseModel):
@@ -37,13 +86,26 @@ class AnalyzeFilingRequest(BaseModel):
     filing_type: str = "4"
     threshold: float = 40.0
 
+class AnalyzeBatchRequest(BaseModel):
+    ciks: List[str]
+    filing_type: str = "4"
+    threshold: float = 40.0
+
+class AIBatchRequest(BaseModel):
+    ciks: List[str]
+    filing_type: str = "4"
+    signal_type: str = "INSIDER_SELLING"
+
 class GenerateProofRequest(BaseModel):
     filing_hash: str
     threshold: int
     total_shares: int
     shares_sold: int
 
-class SignalResponse(BaseModel):
+class SignalModel(BaseModel):
+    # Built straight from InsiderSignal attributes, no dict round-trip
+    model_config = ConfigDict(from_attributes=True)
+    
     signal_type: str
     company_symbol: str
     filing_type: str
@@ -53,6 +115,8 @@ class SignalResponse(BaseModel):
     details: Dict
     filing_url: str
     detected_at: str
+
+class SignalResponse(SignalModel):
     filing_hash: Optional[str] = None
     ipfs_hash: Optional[str] = None
 
@@ -62,6 +126,22 @@ class ProofResponse(BaseModel):
     public_signals: Dict
     timestamp: str
 
+async def pin_filing(filing_hash: str, filing_content: Union[bytes, IO[bytes]]):
+    """Upload a filing to IPFS in the background and remember its CID"""
+    try:
+        ipfs_hash = await analyzer.upload_to_ipfs(filing_content, http_session)
+    finally:
+        if not isinstance(filing_content, bytes):
+            filing_content.close()
+    
+    if ipfs_hash:
+        analyzer.ipfs_cids.put(filing_hash, ipfs_hash)
+
+async def read_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    """Read an uploaded file in fixed-size chunks"""
+    while chunk := await file.read(STREAM_CHUNK_SIZE):
+        yield chunk
+
 # Endpoints
 
 @app.get("/")
@@ -75,7 +155,7 @@ async def root():
     }
 
 @app.post("/analyze/filing", response_model=SignalResponse)
-async def analyze_filing(request: AnalyzeFilingRequest):
+async def analyze_filing(request: AnalyzeFilingRequest, background_tasks: BackgroundTasks):
     """
     Analyze SEC filing for insider signals
     
@@ -87,9 +167,10 @@ async def analyze_filing(request: AnalyzeFilingRequest):
     """
     try:
         # Download filing
-        filing_content = analyzer.download_sec_filing(
+        filing_content = await analyzer.download_sec_filing_bytes(
             request.cik,
-            request.filing_type
+            request.filing_type,
+            http_session
         )
         
         if not filing_content:
@@ -110,17 +191,17 @@ async def analyze_filing(request: AnalyzeFilingRequest):
         if not signal:
             raise HTTPException(status_code=200, detail="No signal detected")
         
-        # Upload to IPFS
-        ipfs_hash = analyzer.upload_to_ipfs(filing_content)
+        # Generate filing hash over the bytes as served by EDGAR
+        filing_hash = hashlib.sha256(filing_content).hexdigest()
         
-        # Generate filing hash
-        filing_hash = hashlib.sha256(filing_content.encode()).hexdigest()
+        # Upload to IPFS after responding (CID available via /filings/{hash}/ipfs)
+        ipfs_hash = analyzer.ipfs_cids.get(filing_hash)
+        if ipfs_hash is None:
+            background_tasks.add_task(pin_filing, filing_hash, filing_content)
         
-        response = SignalResponse(
-            **signal.__dict__,
-            filing_hash=filing_hash,
-            ipfs_hash=ipfs_hash
-        )
+        response = SignalResponse.model_validate(signal)
+        response.filing_hash = filing_hash
+        response.ipfs_hash = ipfs_hash
         
         return response
         
@@ -129,8 +210,108 @@ async def analyze_filing(request: AnalyzeFilingRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/analyze/batch")
+async def analyze_batch(request: AnalyzeBatchRequest):
+    """
+    Analyze the latest filings of several companies concurrently
+    
+    Args:
+        request: Batch analysis request
+    
+    Returns:
+        Per-CIK analysis results
+    """
+    semaphore = asyncio.Semaphore(EDGAR_MAX_CONCURRENCY)
+    
+    async def download_one(cik: str) -> Optional[bytes]:
+        async with semaphore:
+            return await analyzer.download_sec_filing_bytes(
+                cik,
+                request.filing_type,
+                http_session
+            )
+    
+    # Fetch concurrently, then parse/detect in parallel worker processes
+    downloads = await asyncio.gather(
+        *(download_one(cik) for cik in request.ciks),
+        return_exceptions=True
+    )
+    
+    results: List[Dict[str, Any]] = []
+    found: List[Tuple[Dict[str, Any], bytes]] = []
+    for cik, content in zip(request.ciks, downloads):
+        if isinstance(content, BaseException):
+            results.append({"cik": cik, "status": "error", "message": str(content)})
+        elif not content:
+            results.append({"cik": cik, "status": "not_found"})
+        else:
+            result: Dict[str, Any] = {"cik": cik}
+            results.append(result)
+            found.append((result, content))
+    
+    signals = await analyzer.analyze_many([content for _, content in found], request.threshold)
+    
+    for (result, content), signal in zip(found, signals):
+        if isinstance(signal, BaseException):
+            result.update(status="error", message=str(signal))
+        elif not signal:
+            result.update(status="no_signal")
+        else:
+            result.update(
+                status="signal_detected",
+                signal=SignalModel.model_validate(signal),
+                filing_hash=hashlib.sha256(content).hexdigest()
+            )
+    
+    return {
+        "results": results,
+        "count": len(results)
+    }
+
+@app.post("/analyze/ai/batch")
+async def analyze_ai_batch(request: AIBatchRequest):
+    """
+    Run AI analysis on the latest filings of several companies concurrently
+    
+    Args:
+        request: AI batch analysis request
+    
+    Returns:
+        Per-CIK AI analysis results
+    """
+    edgar_semaphore = asyncio.Semaphore(EDGAR_MAX_CONCURRENCY)
+    openai_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+    
+    async def analyze_one(cik: str) -> Dict:
+        try:
+            async with edgar_semaphore:
+                filing_content = await analyzer.download_sec_filing(
+                    cik,
+                    request.filing_type,
+                    http_session
+                )
+            
+            if not filing_content:
+                return {"cik": cik, "status": "not_found"}
+            
+            async with openai_semaphore:
+                analysis = await analyzer.analyze_with_ai(filing_content, request.signal_type)
+            
+            return {"cik": cik, "status": "analyzed", "analysis": analysis}
+            
+        except Exception as e:
+            return {"cik": cik, "status": "error", "message": str(e)}
+    
+    results = await asyncio.gather(*(analyze_one(cik) for cik in request.ciks))
+    
+    return {
+        "results": results,
+        "count": len(results)
+    }
+
 @app.post("/analyze/upload")
 async def analyze_uploaded_filing(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     threshold: float = 40.0
 ):
@@ -144,32 +325,37 @@ async def analyze_uploaded_filing(
     Returns:
         Analysis results
     """
+    # Copy of the upload for the IPFS background task
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE)
+    
     try:
-        # Read file content
-        content = await file.read()
-        filing_content = content.decode('utf-8')
-        
-        # Parse transactions
-        transactions = analyzer.parse_form4_transactions(filing_content)
+        # Hash, parse and spool the upload in a single streaming pass
+        transactions, filing_hash = await analyzer.parse_form4_stream(read_chunks(file), sink=spool)
         
         # Detect signal
         signal = analyzer.detect_insider_selling_signal(transactions, threshold)
         
         if not signal:
+            spool.close()
             return {"status": "no_signal", "message": "No abnormal activity detected"}
         
-        # Upload to IPFS
-        ipfs_hash = analyzer.upload_to_ipfs(filing_content)
-        filing_hash = hashlib.sha256(content).hexdigest()
+        # Upload to IPFS after responding (CID available via /filings/{hash}/ipfs)
+        ipfs_hash = analyzer.ipfs_cids.get(filing_hash)
+        if ipfs_hash is None:
+            spool.seek(0)
+            background_tasks.add_task(pin_filing, filing_hash, spool)
+        else:
+            spool.close()
         
         return {
             "status": "signal_detected",
-            "signal": signal.__dict__,
+            "signal": SignalModel.model_validate(signal),
             "filing_hash": filing_hash,
             "ipfs_hash": ipfs_hash
         }
         
     except Exception as e:
+        spool.close()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/proof/generate", response_model=ProofResponse)
@@ -184,7 +370,7 @@ async def generate_proof(request: GenerateProofRequest):
         ZK proof data
     """
     try:
-        proof = analyzer.generate_zk_proof(
+        proof = await analyzer.generate_zk_proof(
             request.filing_hash,
             request.threshold,
             request.total_shares,
@@ -210,6 +396,27 @@ async def generate_proof(request: GenerateProofRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/filings/{filing_hash}/ipfs")
+async def get_filing_ipfs_hash(filing_hash: str):
+    """
+    Get the IPFS CID of an analyzed filing
+    
+    Args:
+        filing_hash: SHA-256 hash of the filing
+    
+    Returns:
+        IPFS CID once the background upload has completed
+    """
+    ipfs_hash = analyzer.ipfs_cids.get(filing_hash)
+    
+    if ipfs_hash is None:
+        raise HTTPException(status_code=404, detail="Filing not pinned to IPFS yet")
+    
+    return {
+        "filing_hash": filing_hash,
+        "ipfs_hash": ipfs_hash
+    }
+
 @app.get("/signals/recent")
 async def get_recent_signals(limit: int = 10):
     """
@@ -0,0 +1,50 @@
+/**
+ * Persistent Groth16 prover for the Python backend.
+ *
+ * Loads the circuit wasm and proving key once at startup, then reads one
+ * circuit input (JSON) per line on stdin and answers each with one JSON line
+ * on stdout: {"proof": ..., "publicSignals": [...]} or {"error": "..."}.
+ */
+const fs = require("fs");
+const path = require("path");
+const readline = require("readline");
+const snarkjs = require("snarkjs");
+
+const BUILD_DIR = path.join(__dirname, "../circuits/build");
+
+const wasm = new Uint8Array(
+  fs.readFileSync(path.join(BUILD_DIR, "insider_selling_js/insider_selling.wasm"))
+);
+const zkey = new Uint8Array(
+  fs.readFileSync(path.join(BUILD_DIR, "insider_selling_final.zkey"))
+);
+
+async function prove(line) {
+  try {
+    const input = JSON.parse(line);
+    const { proof, publicSignals } = await snarkjs.groth16.fullProve(input, wasm, zkey);
+    return { proof, publicSignals };
+  } catch (error) {
+    return { error: error.message || String(error) };
+  }
+}
+
+// Handle requests strictly in order so each response line matches its request
+let queue = Promise.resolve();
+
+const rl = readline.createInterface({ input: process.stdin });
+
+rl.on("line", (line) => {
+  if (!line.trim()) {
+    return;
+  }
+  queue = queue
+    .then(() => prove(line))
+    .then((result) => {
+      process.stdout.write(JSON.stringify(result) + "\n");
+    });
+});
+
+rl.on("close", () => {
+  queue.then(() => process.exit(0));
+});
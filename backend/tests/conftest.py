@@ -0,0 +1,51 @@
+"""
+Shared test fixtures
+"""
+
+import pytest
+from pathlib import Path
+from analyzer import SECFilingAnalyzer, InsiderTransaction
+
+@pytest.fixture(scope="session")
+def analyzer():
+    """Create analyzer instance shared by all tests (detection is read-only)"""
+    return SECFilingAnalyzer()
+
+@pytest.fixture(scope="session")
+def example_form4():
+    """Raw bytes of the example Form 4 filing shipped in examples/"""
+    return (Path(__file__).resolve().parents[2] / "examples" / "example_form4.xml").read_bytes()
+
+@pytest.fixture(scope="session")
+def sample_transactions():
+    """Sample insider transactions for testing (a tuple, so tests cannot mutate it)"""
+    return (
+        InsiderTransaction.from_api(
+            insider_name="John Doe",
+            title="Chief Executive Officer",
+            transaction_date="2025-01-15",
+            shares_sold=150000,
+            shares_bought=0,
+            shares_owned_after=200000,
+            transaction_type="Sale"
+        ),
+        InsiderTransaction.from_api(
+            insider_name="Jane Smith",
+            title="Chief Financial Officer",
+            transaction_date="2025-01-16",
+            shares_sold=50000,
+            shares_bought=0,
+            shares_owned_after=100000,
+            transaction_type="Sale"
+        )
+    )
+
+@pytest.fixture(scope="session")
+def signal(analyzer, sample_transactions):
+    """Signal detected from the sample transactions at the default 40% threshold"""
+    return analyzer.detect_insider_selling_signal(sample_transactions, threshold=40.0)
+
+@pytest.fixture(scope="session")
+def single_insider_signal(analyzer, sample_transactions):
+    """Signal detected from the first sample transaction alone"""
+    return analyzer.detect_insider_selling_signal(sample_transactions[:1], threshold=40.0)
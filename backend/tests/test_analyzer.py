@@ -3,42 +3,17 @@ Tests for SEC Filing Analyzer
 """
 
 import pytest
-from datetime import datetime
-from analyzer import SECFilingAnalyzer, InsiderTransaction, InsiderSignal
-
-@pytest.fixture
-def analyzer():
-    """Create analyzer instance"""
-    return SECFilingAnalyzer()
-
-@pytest.fixture
-def sample_transactions():
-    """Sample insider transactions for testing"""
-    return [
-        InsiderTransaction(
-            insider_name="John Doe",
-            title="Chief Executive Officer",
-            transaction_date="2025-01-15",
-            shares_sold=150000,
-            shares_bought=0,
-            shares_owned_after=200000,
-            transaction_type="Sale"
-        ),
-        InsiderTransaction(
-            insider_name="Jane Smith",
-            title="Chief Financial Officer",
-            transaction_date="2025-01-16",
-            shares_sold=50000,
-            shares_bought=0,
-            shares_owned_after=100000,
-            transaction_type="Sale"
-        )
-    ]
+import asyncio
+import hashlib
+import subprocess
+import sys
+from datetime import date, datetime
+from types import SimpleNamespace
+import analyzer as analyzer_module
+from analyzer import SECFilingAnalyzer, InsiderTransaction, InsiderSignal, LRUCache
 
-def test_detect_insider_selling_above_threshold(analyzer, sample_transactions):
+def test_detect_insider_selling_above_threshold(signal):
     """Test detection when selling exceeds threshold"""
-    signal = analyzer.detect_insider_selling_signal(sample_transactions, threshold=40.0)
-    
     assert signal is not None
     assert signal.signal_type == "INSIDER_SELLING"
     assert signal.threshold_exceeded == True
@@ -47,7 +22,7 @@ def test_detect_insider_selling_above_threshold(analyzer, sample_transactions):
 def test_detect_insider_selling_below_threshold(analyzer):
     """Test no detection when selling below threshold"""
     transactions = [
-        InsiderTransaction(
+        InsiderTransaction.from_api(
             insider_name="John Doe",
             title="Director",
             transaction_date="2025-01-15",
@@ -64,7 +39,7 @@ def test_detect_insider_selling_below_threshold(analyzer):
 def test_role_weighting_ceo_vs_director(analyzer):
     """Test that CEO sales are weighted higher than Director sales"""
     ceo_transaction = [
-        InsiderTransaction(
+        InsiderTransaction.from_api(
             insider_name="CEO",
             title="Chief Executive Officer",
             transaction_date="2025-01-15",
@@ -76,7 +51,7 @@ def test_role_weighting_ceo_vs_director(analyzer):
     ]
     
     director_transaction = [
-        InsiderTransaction(
+        InsiderTransaction.from_api(
             insider_name="Director",
             title="Director",
             transaction_date="2025-01-15",
@@ -94,31 +69,36 @@ def test_role_weighting_ceo_vs_director(analyzer):
     assert director_signal is not None
     assert ceo_signal.details['effective_percentage'] > director_signal.details['effective_percentage']
 
-def test_confidence_calculation_multiple_factors(analyzer, sample_transactions):
+def test_confidence_calculation_multiple_factors(signal, single_insider_signal):
     """Test confidence scoring with multiple factors"""
-    signal = analyzer.detect_insider_selling_signal(sample_transactions, threshold=40.0)
-    
     assert signal is not None
     assert 0.0 <= signal.confidence <= 0.99
     assert signal.confidence > 0.0  # Should have some confidence
     
     # Check that multiple insiders increases confidence
-    single_insider = [sample_transactions[0]]
-    single_signal = analyzer.detect_insider_selling_signal(single_insider, threshold=40.0)
-    
-    if single_signal:  # Only compare if single insider also triggers
+    if single_insider_signal:  # Only compare if single insider also triggers
         # Multiple insiders should generally have higher confidence
-        assert signal.details['num_unique_insiders'] > single_signal.details['num_unique_insiders']
+        assert signal.details['num_unique_insiders'] > single_insider_signal.details['num_unique_insiders']
 
 def test_empty_transactions(analyzer):
     """Test handling of empty transaction list"""
     signal = analyzer.detect_insider_selling_signal([], threshold=40.0)
     assert signal is None
 
+@pytest.mark.parametrize("title,expected", [
+    ("Chief Executive Officer", 1.5),
+    ("C.E.O.", 1.5),
+    ("Chief Financial-Officer, Director", 1.4),
+    ("Co-Owner", 1.0),
+])
+def test_title_weight_normalizes_punctuation(analyzer, title, expected):
+    """Test role weights ignore case, periods, commas and hyphens in titles"""
+    assert analyzer._title_weight(title) == expected
+
 def test_time_clustering_detection(analyzer):
     """Test detection of time-clustered sales"""
     clustered_transactions = [
-        InsiderTransaction(
+        InsiderTransaction.from_api(
             insider_name="Person A",
             title="CFO",
             transaction_date="2025-01-15",
@@ -127,7 +107,7 @@ def test_time_clustering_detection(analyzer):
             shares_owned_after=100000,
             transaction_type="Sale"
         ),
-        InsiderTransaction(
+        InsiderTransaction.from_api(
             insider_name="Person B",
             title="COO",
             transaction_date="2025-01-20",  # Within 30 days
@@ -144,10 +124,34 @@ def test_time_clustering_detection(analyzer):
     assert 'time_clustered' in signal.details
     assert signal.details['time_clustered'] == True
 
+@pytest.mark.parametrize("last_date,expected_days,expected_clustered", [
+    ("2025-01-18", 29, True),
+    ("2025-01-20", 31, False),
+])
+def test_time_clustering_across_year_boundary(analyzer, last_date, expected_days, expected_clustered):
+    """Test date range is measured in calendar days across month/year boundaries"""
+    transactions = [
+        InsiderTransaction.from_api(
+            insider_name=name,
+            title="CFO",
+            transaction_date=txn_date,
+            shares_sold=50000,
+            shares_bought=0,
+            shares_owned_after=100000,
+            transaction_type="Sale"
+        )
+        for name, txn_date in (("Person A", "2024-12-20"), ("Person B", last_date))
+    ]
+    
+    signal = analyzer.detect_insider_selling_signal(transactions, threshold=30.0)
+    
+    assert signal.details['date_range_days'] == expected_days
+    assert signal.details['time_clustered'] == expected_clustered
+
 def test_percentage_calculation_accuracy(analyzer):
     """Test percentage calculation is accurate"""
     transactions = [
-        InsiderTransaction(
+        InsiderTransaction.from_api(
             insider_name="Test",
             title="CEO",
             transaction_date="2025-01-15",
@@ -164,10 +168,8 @@ def test_percentage_calculation_accuracy(analyzer):
     # Allow small floating point error
     assert abs(signal.threshold_value - 42.9) < 0.1
 
-def test_filing_hash_no_truncation():
+def test_filing_hash_no_truncation(analyzer):
     """Test that filing hash conversion doesn't truncate"""
-    analyzer = SECFilingAnalyzer()
-    
     # 256-bit hash
     filing_hash = "0x1a2b3c4d5e6f7890abcdef1234567890abcdef1234567890abcdef1234567890"
     
@@ -175,26 +177,21 @@ def test_filing_hash_no_truncation():
     # The actual proof generation would fail if truncation was severe
     try:
         # We can't actually generate proof without full setup, but we can test the conversion
-        import hashlib
-        filing_hash_int = int(filing_hash, 16)
-        filing_hash_high = filing_hash_int >> 128
-        filing_hash_low = filing_hash_int & ((1 << 128) - 1)
+        combined_bytes = analyzer._hash256_bytes(filing_hash)
         
-        # Both parts should be non-zero for a random hash
-        assert filing_hash_high > 0
-        assert filing_hash_low > 0
+        # Both 128-bit halves should be non-zero for a random hash
+        assert int.from_bytes(combined_bytes[:16], 'big') > 0
+        assert int.from_bytes(combined_bytes[16:], 'big') > 0
         
-        # Combined should still be large
-        combined_bytes = filing_hash_high.to_bytes(16, 'big') + filing_hash_low.to_bytes(16, 'big')
+        # Combined should still be the full hash
         assert len(combined_bytes) == 32  # Full 256 bits
+        assert combined_bytes == int(filing_hash, 16).to_bytes(32, 'big')
         
     except Exception as e:
         pytest.fail(f"Hash conversion failed: {e}")
 
-def test_signal_details_completeness(analyzer, sample_transactions):
+def test_signal_details_completeness(signal):
     """Test that signal contains all required details"""
-    signal = analyzer.detect_insider_selling_signal(sample_transactions, threshold=40.0)
-    
     assert signal is not None
     
     # Check required fields
@@ -215,7 +212,7 @@ def test_confidence_never_exceeds_99_percent(analyzer):
     """Test that confidence is always capped at 0.99"""
     # Create extreme scenario
     extreme_transactions = [
-        InsiderTransaction(
+        InsiderTransaction.from_api(
             insider_name=f"Exec {i}",
             title="Chief Executive Officer",
             transaction_date="2025-01-15",
@@ -231,5 +228,182 @@ def test_confidence_never_exceeds_99_percent(analyzer):
     assert signal is not None
     assert signal.confidence <= 0.99  # Never 100%
 
+def test_parse_form4_example_filing(analyzer, example_form4):
+    """Test parsing the example Form 4 filing"""
+    transactions = analyzer.parse_form4_transactions(example_form4.decode())
+    
+    assert len(transactions) == 1
+    assert transactions[0].insider_name == "John Doe"
+    assert transactions[0].title == "Chief Executive Officer"
+    assert transactions[0].transaction_date == date(2025, 1, 15).toordinal()
+    assert transactions[0].shares_sold == 150000
+    assert transactions[0].shares_owned_after == 200000
+    assert transactions[0].transaction_type == "Sale"
+
+def test_parse_form4_invalid_content(analyzer):
+    """Test that malformed filings yield no transactions"""
+    assert analyzer.parse_form4_transactions("not xml") == []
+
+def test_parse_form4_reuses_cached_result(analyzer, example_form4):
+    """Test that re-parsing identical content returns the cached transactions"""
+    content = example_form4
+    
+    first = analyzer.parse_form4_transactions(content)
+    second = analyzer.parse_form4_transactions(content.decode())
+    
+    assert first == second
+    assert first is not second  # callers get their own list
+
+def test_parse_form4_stream_matches_full_parse(analyzer, example_form4):
+    """Test single-pass chunked parsing and hashing"""
+    content = example_form4
+    
+    async def chunks():
+        for i in range(0, len(content), 7):
+            yield content[i:i + 7]
+    
+    transactions, filing_hash = asyncio.run(analyzer.parse_form4_stream(chunks()))
+    
+    assert transactions == analyzer.parse_form4_transactions(content)
+    assert filing_hash == hashlib.sha256(content).hexdigest()
+
+def test_analyze_with_ai_sends_risk_section_once():
+    """Test AI analysis prompts with the risk factors section and caches results"""
+    calls = []
+    
+    class FakeCompletions:
+        async def create(self, **kwargs):
+            calls.append(kwargs)
+            message = SimpleNamespace(content='{"detected": true}')
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+    
+    ai_analyzer = SECFilingAnalyzer()
+    ai_analyzer.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    filing = (
+        "Item 1A. Risk Factors 12\n"
+        "Item 1B. Unresolved Staff Comments 20\n"
+        "Item 1A. Risk Factors\n"
+        "We face new regulatory risks.\n"
+        "Item 1B. Unresolved Staff Comments\n"
+        "None."
+    )
+    
+    first = asyncio.run(ai_analyzer.analyze_with_ai(filing, "RISK_LANGUAGE_SURGE"))
+    second = asyncio.run(ai_analyzer.analyze_with_ai(filing, "RISK_LANGUAGE_SURGE"))
+    
+    assert first == second == {"detected": True}
+    assert len(calls) == 1
+    prompt = calls[0]["messages"][1]["content"]
+    assert "We face new regulatory risks." in prompt
+    assert "Unresolved Staff Comments" not in prompt
+
+def test_prompt_excerpt_selects_signal_section(analyzer, example_form4):
+    """Test AI prompts use the filing section relevant to the signal type"""
+    filing = (
+        "Item 5.02 Departure of Directors 3\n"
+        "Item 9.01 Exhibits 4\n"
+        "Item 5.02 Departure of Directors. The CFO resigned effective immediately.\n"
+        "Item 9.01 Financial Statements and Exhibits."
+    )
+    
+    excerpt = analyzer._prompt_excerpt(filing, "EXECUTIVE_EXIT")
+    assert excerpt == "Departure of Directors. The CFO resigned effective immediately."
+    
+    excerpt = analyzer._prompt_excerpt(example_form4.decode(), "INSIDER_SELLING")
+    assert excerpt.startswith("<nonDerivativeTable>")
+    assert excerpt.endswith("</nonDerivativeTable>")
+
+def test_item_sections_ignore_cross_references(analyzer):
+    """Test Item references inside a section do not end it"""
+    filing = (
+        "Item 1A. Risk Factors\n"
+        "Our results may suffer; see Item 7 for liquidity and item 5. for our stock.\n"
+        "Item 1B. Unresolved Staff Comments\n"
+        "None."
+    )
+    
+    sections = analyzer._item_sections(filing)
+    
+    assert sections["1A"] == (
+        "Risk Factors\n"
+        "Our results may suffer; see Item 7 for liquidity and item 5. for our stock."
+    )
+    assert set(sections) == {"1A", "1B"}
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test LRU cache eviction order"""
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+def test_detect_reuses_cached_signal(analyzer, sample_transactions, monkeypatch):
+    """Test repeated detection on identical transactions is served from the cache"""
+    first = analyzer.detect_insider_selling_signal(list(sample_transactions), threshold=40.0)
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("detection should be cached")
+    
+    monkeypatch.setattr(analyzer, "detect_insider_selling_signal_arrays", fail)
+    second = analyzer.detect_insider_selling_signal(list(sample_transactions), threshold=40.0)
+    
+    assert second.details == first.details
+    assert second.confidence == first.confidence
+
+def test_array_path_matches_dataclass_path(analyzer, sample_transactions):
+    """Test that column-array detection matches list-based detection"""
+    arrays = analyzer.transactions_to_arrays(sample_transactions)
+    
+    assert arrays['shares_sold'].tolist() == [150000, 50000]
+    assert arrays['transaction_date'].tolist() == [
+        date(2025, 1, 15).toordinal(),
+        date(2025, 1, 16).toordinal(),
+    ]
+    
+    from_arrays = analyzer.detect_insider_selling_signal_arrays(arrays, threshold=40.0)
+    from_list = analyzer.detect_insider_selling_signal(sample_transactions, threshold=40.0)
+    
+    assert from_arrays.threshold_value == from_list.threshold_value
+    assert from_arrays.confidence == from_list.confidence
+    assert from_arrays.details['roles'] == from_list.details['roles']
+
+def _stub_prover(monkeypatch, script):
+    """Make the prover worker a Python process running script"""
+    real_popen = subprocess.Popen
+    monkeypatch.setattr(
+        analyzer_module.subprocess, "Popen",
+        lambda args, **kwargs: real_popen([sys.executable, "-c", script], **kwargs)
+    )
+
+def test_prover_worker_restarted_after_timeout(monkeypatch):
+    """Test a prover that never answers is killed instead of blocking later proofs"""
+    _stub_prover(monkeypatch, "import time; time.sleep(60)")
+    monkeypatch.setattr(analyzer_module, "PROVER_TIMEOUT", 0.5)
+    analyzer = SECFilingAnalyzer()
+    
+    with pytest.raises(RuntimeError, match="did not answer"):
+        analyzer._prove_with_worker({"threshold": 40})
+    
+    assert analyzer._prover is None
+
+def test_close_prover_kills_busy_worker(monkeypatch):
+    """Test shutdown kills a worker that is still busy after stdin closes"""
+    _stub_prover(monkeypatch, "import time; time.sleep(60)")
+    monkeypatch.setattr(analyzer_module, "PROVER_SHUTDOWN_TIMEOUT", 0.5)
+    analyzer = SECFilingAnalyzer()
+    analyzer._prover = subprocess.Popen(["node"], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    worker = analyzer._prover
+    
+    analyzer.close_prover()
+    
+    assert worker.poll() is not None
+    assert analyzer._prover is None
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -3,13 +3,17 @@ Tests for FastAPI Backend
 """
 
 import pytest
+import asyncio
+import httpx
 from fastapi.testclient import TestClient
-from api import app
+from api import app, analyzer
+from analyzer import LRUCache
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client():
-    """Create test client"""
-    return TestClient(app)
+    """Create test client (startup/shutdown run once for the module)"""
+    with TestClient(app) as client:
+        yield client
 
 def test_root_endpoint(client):
     """Test health check endpoint"""
@@ -68,6 +72,140 @@ def test_analyze_upload_invalid_file(client):
     # Should handle gracefully
     assert response.status_code in [200, 400, 500]
 
+def test_analyze_batch_reports_each_cik(client, monkeypatch):
+    """Test batch analysis returns one result per CIK"""
+    async def no_filing(cik, filing_type="4", session=None):
+        return None
+    
+    monkeypatch.setattr(analyzer, "download_sec_filing_bytes", no_filing)
+    response = client.post(
+        "/analyze/batch",
+        json={"ciks": ["0000000001", "0000000002"]}
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 2
+    assert [r["cik"] for r in data["results"]] == ["0000000001", "0000000002"]
+    assert all(r["status"] == "not_found" for r in data["results"])
+
+def test_analyze_batch_detects_signals_in_workers(client, monkeypatch, example_form4):
+    """Test batch analysis parses downloaded filings in worker processes"""
+    
+    async def fake_download(cik, filing_type="4", session=None):
+        return None if cik == "missing" else example_form4
+    
+    monkeypatch.setattr(analyzer, "download_sec_filing_bytes", fake_download)
+    response = client.post(
+        "/analyze/batch",
+        json={"ciks": ["0000000001", "missing"]}
+    )
+    
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["status"] == "signal_detected"
+    assert results[0]["signal"]["signal_type"] == "INSIDER_SELLING"
+    assert results[1]["status"] == "not_found"
+
+def test_analyze_batch_pairs_results_with_ciks(client, monkeypatch, example_form4):
+    """Test empty downloads do not shift later signals onto the wrong CIK"""
+    
+    async def fake_download(cik, filing_type="4", session=None):
+        return b"" if cik == "empty" else example_form4
+    
+    monkeypatch.setattr(analyzer, "download_sec_filing_bytes", fake_download)
+    response = client.post("/analyze/batch", json={"ciks": ["empty", "0000000001"]})
+    
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["cik"] for r in results] == ["empty", "0000000001"]
+    assert results[0]["status"] == "not_found"
+    assert results[1]["status"] == "signal_detected"
+
+def test_analyze_batch_isolates_failed_analysis(client, monkeypatch):
+    """Test a failed worker only marks its own CIK as an error"""
+    async def fake_download(cik, filing_type="4", session=None):
+        return b"<ownershipDocument/>"
+    
+    async def fake_analyze_many(contents, threshold=40.0):
+        return [RuntimeError("worker crashed"), None]
+    
+    monkeypatch.setattr(analyzer, "download_sec_filing_bytes", fake_download)
+    monkeypatch.setattr(analyzer, "analyze_many", fake_analyze_many)
+    response = client.post("/analyze/batch", json={"ciks": ["0000000001", "0000000002"]})
+    
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0] == {"cik": "0000000001", "status": "error", "message": "worker crashed"}
+    assert results[1] == {"cik": "0000000002", "status": "no_signal"}
+
+def test_analyze_batch_recovers_from_dead_worker(client, monkeypatch, example_form4):
+    """Test a killed worker process does not break later batches"""
+    async def fake_download(cik, filing_type="4", session=None):
+        return example_form4
+    
+    monkeypatch.setattr(analyzer, "download_sec_filing_bytes", fake_download)
+    response = client.post("/analyze/batch", json={"ciks": ["0000000001"]})
+    assert response.json()["results"][0]["status"] == "signal_detected"
+    
+    for process in list(analyzer._pool._processes.values()):
+        process.kill()
+        process.join()
+    
+    response = client.post("/analyze/batch", json={"ciks": ["0000000001", "0000000002"]})
+    
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == ["signal_detected"] * 2
+
+def test_analyze_ai_batch_without_api_key(client, monkeypatch):
+    """Test AI batch analysis reports per-CIK results when AI is unavailable"""
+    async def fake_download(cik, filing_type="4", session=None):
+        return None if cik == "missing" else "<ownershipDocument/>"
+    
+    monkeypatch.setattr(analyzer, "download_sec_filing", fake_download)
+    response = client.post(
+        "/analyze/ai/batch",
+        json={"ciks": ["0000000001", "missing"]}
+    )
+    
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["status"] == "analyzed"
+    assert results[0]["analysis"] == {"error": "AI analysis not available"}
+    assert results[1]["status"] == "not_found"
+
+def test_analyze_upload_pins_filing_in_background(client, monkeypatch, example_form4):
+    """Test uploaded filings are pinned to IPFS after the response"""
+    uploaded = []
+    
+    async def fake_upload(content, session=None):
+        uploaded.append(content.read())
+        return "QmTestCid"
+    
+    monkeypatch.setattr(analyzer, "upload_to_ipfs", fake_upload)
+    monkeypatch.setattr(analyzer, "ipfs_cids", LRUCache())
+    response = client.post(
+        "/analyze/upload",
+        files={"file": ("form4.xml", example_form4, "text/xml")}
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "signal_detected"
+    assert data["signal"]["signal_type"] == "INSIDER_SELLING"
+    assert data["signal"]["details"]["num_transactions"] > 0
+    
+    pinned = client.get(f"/filings/{data['filing_hash']}/ipfs")
+    assert pinned.status_code == 200
+    assert pinned.json()["ipfs_hash"] == "QmTestCid"
+    assert uploaded == [example_form4]
+
+def test_filing_ipfs_hash_unknown(client):
+    """Test CID lookup for a filing that was never pinned"""
+    response = client.get("/filings/deadbeef/ipfs")
+    
+    assert response.status_code == 404
+
 def test_cors_headers(client):
     """Test CORS headers are present"""
     response = client.options("/")
@@ -92,5 +230,33 @@ def test_openapi_schema_available(client):
     assert "info" in data
     assert "paths" in data
 
+def test_large_responses_are_gzipped(client):
+    """Test larger payloads are gzip-compressed for clients that accept it"""
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "paths" in response.json()
+
+def test_read_endpoints_concurrently():
+    """Test independent read endpoints served concurrently on one event loop"""
+    paths = [
+        "/",
+        "/stats",
+        "/bounties/active",
+        "/researcher/0x1234567890123456789012345678901234567890/reputation",
+        "/signals/recent?limit=5",
+        "/openapi.json",
+    ]
+    
+    async def fetch_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get(path) for path in paths))
+    
+    responses = asyncio.run(fetch_all())
+    
+    assert [r.status_code for r in responses] == [200] * len(paths)
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])